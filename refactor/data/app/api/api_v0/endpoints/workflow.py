@@ -18,22 +18,106 @@
 #
 # Relief from the License may be granted by purchasing a commercial license.
 
-import io
-from typing import Any, Union
+import json
+import os
+from typing import Any, BinaryIO, Iterator, Optional
 
-from app.schemas.common import HTTPExceptionSchema
-from app.schemas.workflow import (
-    InsertResultResponse,
-    Node,
-    Result,
-    ResultPickle,
-    UpdateResultResponse,
+from app.core.frames import InvalidFramesError
+from app.core.storage import (
+    EmptyResultError,
+    is_queued,
+    mark_queued,
+    read_result,
+    result_path,
+    store_result,
+    write_result,
 )
-from fastapi import APIRouter, UploadFile, HTTPException
-from fastapi.responses import FileResponse, StreamingResponse
+from app.schemas.common import HTTPExceptionSchema
+from app.schemas.workflow import InsertResultResponse, Node, UpdateResultResponse
+from fastapi import APIRouter, Header, HTTPException, Request
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
+
+try:
+    import lz4.frame
+except ModuleNotFoundError:
+    lz4 = None
 
 router = APIRouter()
 
+# Constant response bodies are serialized once instead of on every request
+_TASK_UPDATED_JSON = json.dumps(
+    {"response": "Task updated successfully"}, separators=(",", ":")
+).encode()
+_RESULT_UPDATED_JSON = json.dumps(
+    {"response": "Result updated successfully"}, separators=(",", ":")
+).encode()
+_RESULT_QUEUED_JSON = json.dumps(
+    {"response": "Result marked as queued"}, separators=(",", ":")
+).encode()
+_RESULT_NOT_FOUND_JSON = json.dumps({"detail": "Result not found"}, separators=(",", ":")).encode()
+
+# Result pickles are sent as the raw request body
+_RESULT_BODY = {
+    "requestBody": {
+        "content": {
+            "application/octet-stream": {"schema": {"type": "string", "format": "binary"}}
+        },
+        "required": True,
+    }
+}
+
+# Result bodies depend on the Accept-Encoding header, so caches must key on it
+_VARY_HEADERS = {"Vary": "Accept-Encoding"}
+
+# Size of the chunks result pickles are streamed in
+_RESULT_CHUNK_SIZE = 64 * 1024
+
+# Result pickles larger than this are streamed from disk instead of being read into memory,
+# and are LZ4 compressed for clients that accept it
+_LARGE_RESULT_SIZE = 1024 * 1024
+
+
+def _iter_chunks(f: BinaryIO) -> Iterator[bytes]:
+    # A plain generator, so Starlette reads each chunk in its threadpool
+    with f:
+        yield from iter(lambda: f.read(_RESULT_CHUNK_SIZE), b"")
+
+
+def _iter_lz4_chunks(f: BinaryIO) -> Iterator[bytes]:
+    compressor = lz4.frame.LZ4FrameCompressor(block_size=lz4.frame.BLOCKSIZE_MAX4MB)
+    yield compressor.begin()
+    for chunk in _iter_chunks(f):
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def _result_not_found() -> Response:
+    # Unknown ids are the common failure, so answer them without raising an HTTPException
+    return Response(content=_RESULT_NOT_FOUND_JSON, status_code=404, media_type="application/json")
+
+
+def _accepts_lz4(accept_encoding: Optional[str]) -> bool:
+    # An explicit lz4 entry takes precedence over a wildcard, and a q-value of 0 refuses it
+    if lz4 is None or not accept_encoding:
+        return False
+
+    qvalues = {}
+    for entry in accept_encoding.split(","):
+        coding, *params = entry.split(";")
+        qvalue = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    qvalue = float(value)
+                except ValueError:
+                    qvalue = 0.0
+        qvalues[coding.strip().lower()] = qvalue
+
+    return qvalues.get("lz4", qvalues.get("*", 0.0)) > 0
+
 
 @router.get(
     "/results/{dispatch_id}",
@@ -50,29 +134,135 @@ router = APIRouter()
 def get_result(
     *,
     dispatch_id: str,
+    accept_encoding: Optional[str] = Header(None),
 ) -> Any:
     """
     Get a result object as pickle file
+
+    Pickles over 1 MiB are streamed straight from the results directory, LZ4 compressed
+    (Content-Encoding: lz4) when the client accepts lz4 in its Accept-Encoding header.
+    Smaller ones are served from memory in a single response body.
     """
-    result: bytes = b'\x00\xF0'
-    # update logic to db lookup
-    if not dispatch_id:
-        raise HTTPException(status_code=404, detail="Result not found")
-    return StreamingResponse(io.BytesIO(result), media_type="application/octet-stream")
+    try:
+        f = open(result_path(dispatch_id), "rb")
+    except FileNotFoundError:
+        return _result_not_found()
+
+    # The length and the body both come from the open file, so a pickle renamed into place by
+    # replace_result meanwhile cannot pair the old file's length with the new file's bytes
+    size = os.fstat(f.fileno()).st_size
+    if size > _LARGE_RESULT_SIZE:
+        if _accepts_lz4(accept_encoding):
+            return StreamingResponse(
+                _iter_lz4_chunks(f),
+                media_type="application/octet-stream",
+                headers={"Content-Encoding": "lz4", **_VARY_HEADERS},
+            )
+        return StreamingResponse(
+            _iter_chunks(f),
+            media_type="application/octet-stream",
+            headers={
+                "Content-Length": str(size),
+                "Content-Disposition": f'attachment; filename="{dispatch_id}.pkl"',
+                **_VARY_HEADERS,
+            },
+        )
+    f.close()
+
+    result = read_result(dispatch_id)
+    if result is None:
+        return _result_not_found()
+    return Response(content=result, media_type="application/octet-stream", headers=_VARY_HEADERS)
 
 
 
-@router.post("/results", status_code=200, response_model=InsertResultResponse)
-def insert_result(
+@router.post(
+    "/results",
+    status_code=202,
+    response_model=InsertResultResponse,
+    responses={
+        200: {
+            "model": InsertResultResponse,
+            "description": "Return dispatch id of an identical earlier upload",
+        },
+        400: {"model": HTTPExceptionSchema, "description": "Result pickle is empty or malformed"},
+    },
+    openapi_extra=_RESULT_BODY,
+)
+async def insert_result(
     *,
-    result_pkl_file: UploadFile,
+    request: Request,
 ) -> Any:
     """
     Submit pickled result file
+
+    The request body is the framed pickle described in `app.core.frames`, which is
+    streamed to disk chunk by chunk rather than being read into memory first. A pickle
+    identical to one uploaded before is not stored again; the dispatch id of the earlier
+    upload is returned with a 200 status instead, along with whether that dispatch has
+    been marked as queued by `queue_result`. An empty or malformed body is rejected with a
+    400 status.
     """
-    return {
-        "dispatch_id": "e4efd26c-240d-4ab1-9826-26ada91e429f"
-    }
+    try:
+        dispatch_id, stored_before = await store_result(request.stream())
+    except (EmptyResultError, InvalidFramesError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    queued = stored_before and is_queued(dispatch_id)
+    # The response is built by the server, so skip validating it against the response model
+    return JSONResponse(
+        {"dispatch_id": dispatch_id, "queued": queued}, status_code=200 if stored_before else 202
+    )
+
+
+@router.put(
+    "/results/{dispatch_id}/queued",
+    status_code=200,
+    response_model=UpdateResultResponse,
+    responses={404: {"model": HTTPExceptionSchema, "description": "Result was not found"}},
+)
+async def queue_result(
+    *,
+    dispatch_id: str,
+) -> Any:
+    """
+    Mark a result object as queued for execution
+
+    Identical uploads of a result object marked as queued report it as queued, so the
+    Queuer service does not queue its dispatch again.
+    """
+    if not mark_queued(dispatch_id):
+        return _result_not_found()
+    return Response(content=_RESULT_QUEUED_JSON, media_type="application/json")
+
+
+@router.put(
+    "/results/{dispatch_id}/pickle",
+    status_code=200,
+    response_model=UpdateResultResponse,
+    responses={
+        400: {"model": HTTPExceptionSchema, "description": "Result pickle is empty or malformed"},
+        404: {"model": HTTPExceptionSchema, "description": "Result was not found"},
+    },
+    openapi_extra=_RESULT_BODY,
+)
+async def replace_result(
+    *,
+    dispatch_id: str,
+    request: Request,
+) -> Any:
+    """
+    Replace a stored result object with an updated pickle
+
+    The request body is framed like an upload to `insert_result` and is streamed to
+    disk the same way, then renamed over the stored pickle.
+    """
+    if not result_path(dispatch_id).exists():
+        return _result_not_found()
+    try:
+        await write_result(dispatch_id, request.stream())
+    except (EmptyResultError, InvalidFramesError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return Response(content=_RESULT_UPDATED_JSON, media_type="application/json")
 
 
 @router.put(
@@ -85,7 +275,7 @@ def insert_result(
             "description": "Return message indicating success of updating task",
         }
 })
-def update_result(
+async def update_result(
     *,
     dispatch_id: str,
     task: Node
@@ -96,6 +286,4 @@ def update_result(
     # update logic to db lookup
     if not dispatch_id:
         raise HTTPException(status_code=404, detail="Result not found")
-    return {
-        "response": "Task updated successfully"
-    }
+    return Response(content=_TASK_UPDATED_JSON, media_type="application/json")
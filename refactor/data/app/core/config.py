@@ -29,6 +29,8 @@ load_dotenv()
 
 class Settings(BaseSettings):
     API_V0_STR: str = "/api/v0"
+    RESULTS_DIR: str = "results"
+    RESULTS_CACHE_SIZE: int = 256 * 1024 * 1024
     BACKEND_CORS_ORIGINS: List[AnyHttpUrl] = []
 
     @validator("BACKEND_CORS_ORIGINS", pre=True)
@@ -0,0 +1,81 @@
+# Copyright 2021 Agnostiq Inc.
+#
+# This file is part of Covalent.
+#
+# Licensed under the GNU Affero General Public License 3.0 (the "License").
+# A copy of the License may be obtained with this software package or at
+#
+#      https://www.gnu.org/licenses/agpl-3.0.en.html
+#
+# Use of this file is prohibited except in compliance with the License. Any
+# modifications or derivative works of this file must retain this copyright
+# notice, and modified files must contain a notice indicating that they have
+# been altered from the originals.
+#
+# Covalent is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the License for more details.
+#
+# Relief from the License may be granted by purchasing a commercial license.
+
+"""Framing of the result objects stored by the Data service.
+
+Result objects are uploaded and downloaded as a pickle (protocol 5) together with its
+out-of-band buffers, laid out as
+
+    <frame count: u32 LE> <frame size: u64 LE> * count <frame> * count
+
+The last frame is the pickle itself and the ones before it are its out-of-band buffers, in the
+order the pickler emitted them; a pickle without out-of-band buffers is a single frame. The
+Data service never unpickles results, it only checks that uploads match their frame header.
+"""
+
+import struct
+
+FRAME_COUNT = struct.Struct("<I")
+FRAME_SIZE = struct.Struct("<Q")
+
+# Bounds the header held in memory while it arrives. The first four bytes of a bare pickle
+# read as a frame count well above this, so those are rejected before the rest is read.
+MAX_FRAMES = 1 << 20
+
+
+class InvalidFramesError(ValueError):
+    """Raised when an uploaded result object does not match its frame header."""
+
+
+class FrameValidator:
+    """Check the framing of an uploaded result object as its chunks arrive."""
+
+    def __init__(self) -> None:
+        self._header = bytearray()
+        self._header_size = FRAME_COUNT.size
+        self._count = None
+        self._expected_size = None
+        self._size = 0
+
+    def update(self, chunk: bytes) -> None:
+        self._size += len(chunk)
+        view = memoryview(chunk)
+        while self._expected_size is None and view:
+            missing = self._header_size - len(self._header)
+            self._header += view[:missing]
+            view = view[missing:]
+            if len(self._header) < self._header_size:
+                return
+
+            if self._count is None:
+                (self._count,) = FRAME_COUNT.unpack(self._header)
+                if not 0 < self._count <= MAX_FRAMES:
+                    raise InvalidFramesError("Result object has an invalid frame count")
+                self._header_size += self._count * FRAME_SIZE.size
+            else:
+                sizes = struct.unpack_from(f"<{self._count}Q", self._header, FRAME_COUNT.size)
+                self._expected_size = self._header_size + sum(sizes)
+                self._header = bytearray()
+
+    def check(self) -> None:
+        """Raise ``InvalidFramesError`` unless the whole upload matched its frame header."""
+
+        if self._expected_size is None or self._size != self._expected_size:
+            raise InvalidFramesError("Result object does not match its frame header")
@@ -0,0 +1,249 @@
+# Copyright 2021 Agnostiq Inc.
+#
+# This file is part of Covalent.
+#
+# Licensed under the GNU Affero General Public License 3.0 (the "License").
+# A copy of the License may be obtained with this software package or at
+#
+#      https://www.gnu.org/licenses/agpl-3.0.en.html
+#
+# Use of this file is prohibited except in compliance with the License. Any
+# modifications or derivative works of this file must retain this copyright
+# notice, and modified files must contain a notice indicating that they have
+# been altered from the originals.
+#
+# Covalent is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the License for more details.
+#
+# Relief from the License may be granted by purchasing a commercial license.
+
+"""Filesystem storage for pickled result objects."""
+
+import hashlib
+import os
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import AsyncIterator, BinaryIO, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from .config import settings
+from .frames import FrameValidator
+
+
+class _ResultCache:
+    """Least recently used cache of pickled result objects, bounded by their total size.
+
+    Entries are tagged with the inode and modification time of the file they were read from.
+    Results are only ever replaced by renaming a new file into place, so a changed tag means
+    the entry is stale, including when the file was rewritten by another worker process.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._size = 0
+        self._entries: "OrderedDict[str, Tuple[Tuple[int, int], bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, dispatch_id: str, version: Tuple[int, int]) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(dispatch_id)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(dispatch_id)
+            return entry[1]
+
+    def put(self, dispatch_id: str, version: Tuple[int, int], result: bytes) -> None:
+        if len(result) > self.max_size:
+            return
+
+        with self._lock:
+            self._pop(dispatch_id)
+            self._entries[dispatch_id] = (version, result)
+            self._size += len(result)
+            while self._size > self.max_size:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def invalidate(self, dispatch_id: str) -> None:
+        with self._lock:
+            self._pop(dispatch_id)
+
+    def _pop(self, dispatch_id: str) -> None:
+        entry = self._entries.pop(dispatch_id, None)
+        if entry is not None:
+            self._size -= len(entry[1])
+
+
+_cache = _ResultCache(settings.RESULTS_CACHE_SIZE)
+
+
+def result_path(dispatch_id: str) -> Path:
+    """Location of the pickled result object for a dispatch."""
+
+    return Path(settings.RESULTS_DIR) / f"{dispatch_id}.pkl"
+
+
+def digest_path(digest: str) -> Path:
+    """Location of the link from the hash of an uploaded pickle to its dispatch id.
+
+    The link is a symlink whose target is the bare dispatch id, so it deliberately dangles;
+    it is only ever read with ``os.readlink`` and never followed. Symlinks are used because
+    creating one is atomic and fails if the name is taken, and reading one back is a single
+    system call. The link keeps pointing at the dispatch after ``write_result`` replaces its
+    pickle, so a repeated upload rejoins the dispatch it started.
+    """
+
+    return Path(settings.RESULTS_DIR) / "digests" / digest
+
+
+def queued_path(dispatch_id: str) -> Path:
+    """Location of the marker recording that a dispatch has been queued for execution.
+
+    The marker is shared by every worker and survives restarts, so it is what keeps an
+    identical upload from being queued a second time.
+    """
+
+    return Path(settings.RESULTS_DIR) / "queued" / dispatch_id
+
+
+def is_queued(dispatch_id: str) -> bool:
+    """Whether a dispatch has been marked as queued with `mark_queued`."""
+
+    return queued_path(dispatch_id).exists()
+
+
+def mark_queued(dispatch_id: str) -> bool:
+    """Record that a dispatch has been queued, or return ``False`` if it has no result."""
+
+    if not result_path(dispatch_id).exists():
+        return False
+
+    path = queued_path(dispatch_id)
+    path.parent.mkdir(exist_ok=True)
+    path.touch()
+    return True
+
+
+def read_result(dispatch_id: str) -> Optional[bytes]:
+    """Pickled result object for a dispatch, or ``None`` if it has not been stored.
+
+    The pickle is returned exactly as it was uploaded; the data service never
+    needs to unpickle it, so there is no serialization cost on this side. Recently read
+    results are served from memory as long as the file on disk has not been replaced.
+    """
+
+    path = result_path(dispatch_id)
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        _cache.invalidate(dispatch_id)
+        return None
+
+    version = (stat.st_ino, stat.st_mtime_ns)
+    result = _cache.get(dispatch_id, version)
+    if result is None:
+        result = path.read_bytes()
+        _cache.put(dispatch_id, version, result)
+
+    return result
+
+
+class EmptyResultError(ValueError):
+    """Raised when an uploaded result pickle has no content."""
+
+
+def _write_chunk(
+    f: BinaryIO, hasher: "hashlib.blake2b", validator: FrameValidator, chunk: bytes
+) -> int:
+    validator.update(chunk)
+    hasher.update(chunk)
+    return f.write(chunk)
+
+
+async def _receive(chunks: AsyncIterator[bytes]) -> Tuple[str, str]:
+    """Write chunks to a temporary file in the results directory as they arrive.
+
+    Returns the path of the temporary file and the hash of its contents. Raises
+    ``EmptyResultError`` if no bytes arrived and ``InvalidFramesError`` if they do not match
+    their frame header.
+    """
+
+    results_dir = Path(settings.RESULTS_DIR)
+    results_dir.mkdir(parents=True, exist_ok=True)
+
+    hasher = hashlib.blake2b(digest_size=16)
+    validator = FrameValidator()
+    fd, tmp_path = tempfile.mkstemp(dir=results_dir, suffix=".part")
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as f:
+            async for chunk in chunks:
+                size += await run_in_threadpool(_write_chunk, f, hasher, validator, chunk)
+        if not size:
+            raise EmptyResultError("Result pickle is empty")
+        validator.check()
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+    return tmp_path, hasher.hexdigest()
+
+
+async def store_result(chunks: AsyncIterator[bytes]) -> Tuple[str, bool]:
+    """Store a newly uploaded pickled result object as its chunks arrive.
+
+    Returns the dispatch id of the result and whether an identical pickle had been stored
+    before. Uploads are addressed by the hash of their contents, so a pickle that was
+    uploaded before is not written again and the dispatch id of the earlier upload is
+    returned instead.
+    """
+
+    tmp_path, digest = await _receive(chunks)
+    link = digest_path(digest)
+
+    try:
+        try:
+            return os.readlink(link), True
+        except FileNotFoundError:
+            pass
+
+        dispatch_id = str(uuid.uuid4())
+        os.replace(tmp_path, result_path(dispatch_id))
+
+        link.parent.mkdir(exist_ok=True)
+        try:
+            # Dangling on purpose, see digest_path; only one of several identical uploads wins
+            os.symlink(dispatch_id, link)
+        except FileExistsError:
+            os.unlink(result_path(dispatch_id))
+            return os.readlink(link), True
+
+        return dispatch_id, False
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+async def write_result(dispatch_id: str, chunks: AsyncIterator[bytes]) -> Path:
+    """Replace the pickled result object of a dispatch as the chunks of the new one arrive.
+
+    The chunks go to a temporary file next to the destination which is only
+    renamed into place once the stream is exhausted, so readers never see a
+    partially written pickle. The cached copy of the old pickle is dropped.
+    """
+
+    path = result_path(dispatch_id)
+    tmp_path, _ = await _receive(chunks)
+    try:
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    _cache.invalidate(dispatch_id)
+
+    return path
@@ -61,6 +61,7 @@ class Result(BaseModel):
 
 class InsertResultResponse(BaseModel):
     dispatch_id: str
+    queued: bool
 
 
 class UpdateResultResponse(BaseModel):
@@ -0,0 +1,44 @@
+# Copyright 2021 Agnostiq Inc.
+#
+# This file is part of Covalent.
+#
+# Licensed under the GNU Affero General Public License 3.0 (the "License").
+# A copy of the License may be obtained with this software package or at
+#
+#      https://www.gnu.org/licenses/agpl-3.0.en.html
+#
+# Use of this file is prohibited except in compliance with the License. Any
+# modifications or derivative works of this file must retain this copyright
+# notice, and modified files must contain a notice indicating that they have
+# been altered from the originals.
+#
+# Covalent is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the License for more details.
+#
+# Relief from the License may be granted by purchasing a commercial license.
+
+"""Fixtures for the Data service tests."""
+
+import pytest
+from app.core import storage
+from app.core.config import settings
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def results_dir(tmp_path, monkeypatch):
+    """An empty results directory and result cache for each test."""
+
+    monkeypatch.setattr(settings, "RESULTS_DIR", str(tmp_path))
+    monkeypatch.setattr(storage, "_cache", storage._ResultCache(settings.RESULTS_CACHE_SIZE))
+    return tmp_path
+
+
+@pytest.fixture
+def client(results_dir):
+    """Test client for the Data service storing results in `results_dir`."""
+
+    from main import app
+
+    return TestClient(app)
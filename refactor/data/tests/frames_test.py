@@ -0,0 +1,79 @@
+# Copyright 2021 Agnostiq Inc.
+#
+# This file is part of Covalent.
+#
+# Licensed under the GNU Affero General Public License 3.0 (the "License").
+# A copy of the License may be obtained with this software package or at
+#
+#      https://www.gnu.org/licenses/agpl-3.0.en.html
+#
+# Use of this file is prohibited except in compliance with the License. Any
+# modifications or derivative works of this file must retain this copyright
+# notice, and modified files must contain a notice indicating that they have
+# been altered from the originals.
+#
+# Covalent is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the License for more details.
+#
+# Relief from the License may be granted by purchasing a commercial license.
+
+"""Tests for the framing of uploaded result objects."""
+
+import pickle
+
+import pytest
+from app.core.frames import FRAME_COUNT, FRAME_SIZE, MAX_FRAMES, FrameValidator, InvalidFramesError
+
+
+def framed(*frames: bytes) -> bytes:
+    header = FRAME_COUNT.pack(len(frames)) + b"".join(FRAME_SIZE.pack(len(f)) for f in frames)
+    return header + b"".join(frames)
+
+
+BODY = framed(b"buffer one", b"", b"buffer three", pickle.dumps("pickle", protocol=5))
+HEADER_SIZE = FRAME_COUNT.size + 4 * FRAME_SIZE.size
+
+
+@pytest.mark.parametrize("split", range(HEADER_SIZE + 2))
+def test_frame_validator_header_split(split):
+    """Test that a body is accepted however its header is split across chunks."""
+
+    validator = FrameValidator()
+    validator.update(BODY[:split])
+    validator.update(BODY[split:])
+    validator.check()
+
+
+def test_frame_validator_byte_by_byte():
+    """Test that a body is accepted when it arrives one byte at a time."""
+
+    validator = FrameValidator()
+    for i in range(len(BODY)):
+        validator.update(BODY[i : i + 1])
+    validator.check()
+
+
+@pytest.mark.parametrize("protocol", [4, 5])
+def test_frame_validator_rejects_bare_pickle(protocol):
+    """Test that the frame count of a bare pickle exceeds MAX_FRAMES."""
+
+    pickled = pickle.dumps({"result": 1}, protocol=protocol)
+    assert FRAME_COUNT.unpack_from(pickled)[0] > MAX_FRAMES
+
+    with pytest.raises(InvalidFramesError, match="frame count"):
+        FrameValidator().update(pickled)
+
+
+@pytest.mark.parametrize(
+    "body",
+    [b"", BODY[: HEADER_SIZE - 1], BODY[:-1], BODY + b"\0", FRAME_COUNT.pack(0)],
+    ids=["empty", "partial-header", "truncated", "padded", "no-frames"],
+)
+def test_frame_validator_rejects_mismatched_body(body):
+    """Test that bodies which do not match their frame header are rejected."""
+
+    validator = FrameValidator()
+    with pytest.raises(InvalidFramesError):
+        validator.update(body)
+        validator.check()
@@ -0,0 +1,107 @@
+# Copyright 2021 Agnostiq Inc.
+#
+# This file is part of Covalent.
+#
+# Licensed under the GNU Affero General Public License 3.0 (the "License").
+# A copy of the License may be obtained with this software package or at
+#
+#      https://www.gnu.org/licenses/agpl-3.0.en.html
+#
+# Use of this file is prohibited except in compliance with the License. Any
+# modifications or derivative works of this file must retain this copyright
+# notice, and modified files must contain a notice indicating that they have
+# been altered from the originals.
+#
+# Covalent is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the License for more details.
+#
+# Relief from the License may be granted by purchasing a commercial license.
+
+"""Tests for the filesystem storage of result objects."""
+
+import asyncio
+import os
+
+import pytest
+from app.core import storage
+from app.core.frames import FRAME_COUNT, FRAME_SIZE, InvalidFramesError
+
+
+def frame(pickled: bytes) -> bytes:
+    """Frame a pickle without out-of-band buffers."""
+
+    return FRAME_COUNT.pack(1) + FRAME_SIZE.pack(len(pickled)) + pickled
+
+
+async def chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+def store(*parts: bytes):
+    return asyncio.run(storage.store_result(chunks(*parts)))
+
+
+def test_store_result_losing_symlink_race(results_dir, monkeypatch):
+    """Test that the loser of a race between identical uploads discards its own pickle."""
+
+    body = frame(b"result")
+    winner_id = "winner"
+    (results_dir / f"{winner_id}.pkl").write_bytes(body)
+
+    real_symlink = os.symlink
+
+    def symlink_after_winner(target, link):
+        # The winning upload creates the link between our lookup and our own symlink call
+        real_symlink(winner_id, link)
+        real_symlink(target, link)
+
+    monkeypatch.setattr(storage.os, "symlink", symlink_after_winner)
+
+    assert store(body) == (winner_id, True)
+    assert set(os.listdir(results_dir)) == {"digests", f"{winner_id}.pkl"}
+
+
+def test_store_result_cleans_up_interrupted_upload(results_dir):
+    """Test that an upload failing mid-stream leaves no temporary file behind."""
+
+    async def interrupted():
+        yield frame(b"result")[:8]
+        raise ConnectionError("client disconnected")
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(storage.store_result(interrupted()))
+
+    assert os.listdir(results_dir) == []
+
+
+@pytest.mark.parametrize(
+    "parts, error",
+    [
+        ((), storage.EmptyResultError),
+        ((b"",), storage.EmptyResultError),
+        ((b"result",), InvalidFramesError),
+        ((frame(b"result")[:-1],), InvalidFramesError),
+    ],
+    ids=["no-chunks", "empty-chunk", "bare", "truncated"],
+)
+def test_store_result_rejects_malformed_upload(results_dir, parts, error):
+    """Test that rejected uploads raise and leave no temporary file behind."""
+
+    with pytest.raises(error):
+        store(*parts)
+
+    assert os.listdir(results_dir) == []
+
+
+def test_write_result_invalidates_cache(results_dir):
+    """Test that rewriting a result replaces the cached copy of the old one."""
+
+    dispatch_id, _ = store(frame(b"old"))
+    assert storage.read_result(dispatch_id) == frame(b"old")
+
+    asyncio.run(storage.write_result(dispatch_id, chunks(frame(b"new"))))
+
+    assert storage.read_result(dispatch_id) == frame(b"new")
+    assert set(os.listdir(results_dir)) == {f"{dispatch_id}.pkl", "digests"}
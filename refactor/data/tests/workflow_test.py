@@ -0,0 +1,152 @@
+# Copyright 2021 Agnostiq Inc.
+#
+# This file is part of Covalent.
+#
+# Licensed under the GNU Affero General Public License 3.0 (the "License").
+# A copy of the License may be obtained with this software package or at
+#
+#      https://www.gnu.org/licenses/agpl-3.0.en.html
+#
+# Use of this file is prohibited except in compliance with the License. Any
+# modifications or derivative works of this file must retain this copyright
+# notice, and modified files must contain a notice indicating that they have
+# been altered from the originals.
+#
+# Covalent is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the License for more details.
+#
+# Relief from the License may be granted by purchasing a commercial license.
+
+"""Tests for the Data service workflow result endpoints."""
+
+import asyncio
+import os
+import pickle
+
+import pytest
+from app.api.api_v0.endpoints.workflow import get_result
+from app.core.frames import FRAME_COUNT, FRAME_SIZE
+from app.core.storage import result_path
+
+RESULTS_URL = "/api/v0/workflow/results"
+
+
+def frame(pickled: bytes) -> bytes:
+    """Frame a pickle without out-of-band buffers."""
+
+    return FRAME_COUNT.pack(1) + FRAME_SIZE.pack(len(pickled)) + pickled
+
+
+def stored_files(results_dir):
+    return sorted(path.name for path in results_dir.iterdir() if path.is_file())
+
+
+def test_insert_result_returns_earlier_dispatch_id(client, results_dir):
+    """Test that uploading an identical pickle again returns the earlier dispatch id."""
+
+    body = frame(pickle.dumps({"result": 1}, protocol=5))
+
+    first = client.post(RESULTS_URL, content=body)
+    second = client.post(RESULTS_URL, content=body)
+
+    assert first.status_code == 202
+    assert second.status_code == 200
+    assert second.json() == {"dispatch_id": first.json()["dispatch_id"], "queued": False}
+    assert stored_files(results_dir) == [f"{first.json()['dispatch_id']}.pkl"]
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b"",
+        pickle.dumps({"result": 1}, protocol=4),
+        pickle.dumps({"result": 1}, protocol=5),
+        frame(pickle.dumps({"result": 1}, protocol=5))[:-1],
+        frame(pickle.dumps({"result": 1}, protocol=5)) + b"\0",
+    ],
+    ids=["empty", "bare-protocol-4", "bare-protocol-5", "truncated", "padded"],
+)
+def test_insert_result_rejects_malformed_body(client, results_dir, body):
+    """Test that empty and malformed uploads are rejected without leaving files behind."""
+
+    resp = client.post(RESULTS_URL, content=body)
+
+    assert resp.status_code == 400
+    assert stored_files(results_dir) == []
+
+
+@pytest.mark.parametrize("size", [16, 2 * 1024 * 1024], ids=["small", "large"])
+def test_replace_result(client, results_dir, size):
+    """Test that a replaced result is served instead of the cached original."""
+
+    original = frame(b"a" * size)
+    replacement = frame(b"b" * size)
+    dispatch_id = client.post(RESULTS_URL, content=original).json()["dispatch_id"]
+    assert client.get(f"{RESULTS_URL}/{dispatch_id}").content == original
+
+    resp = client.put(f"{RESULTS_URL}/{dispatch_id}/pickle", content=replacement)
+
+    assert resp.status_code == 200
+    assert client.get(f"{RESULTS_URL}/{dispatch_id}").content == replacement
+    assert stored_files(results_dir) == [f"{dispatch_id}.pkl"]
+
+
+def test_replace_result_rejects_unknown_dispatch(client, results_dir):
+    """Test that replacing the result of an unknown dispatch fails without storing it."""
+
+    resp = client.put(f"{RESULTS_URL}/unknown/pickle", content=frame(b"result"))
+
+    assert resp.status_code == 404
+    assert stored_files(results_dir) == []
+
+
+def test_replace_result_rejects_malformed_body(client, results_dir):
+    """Test that a malformed replacement leaves the stored result in place."""
+
+    original = frame(b"result")
+    dispatch_id = client.post(RESULTS_URL, content=original).json()["dispatch_id"]
+
+    resp = client.put(f"{RESULTS_URL}/{dispatch_id}/pickle", content=b"result")
+
+    assert resp.status_code == 400
+    assert client.get(f"{RESULTS_URL}/{dispatch_id}").content == original
+    assert stored_files(results_dir) == [f"{dispatch_id}.pkl"]
+
+
+def test_queue_result(client, results_dir):
+    """Test that identical uploads report a dispatch once it has been marked as queued."""
+
+    body = frame(b"result")
+    dispatch_id = client.post(RESULTS_URL, content=body).json()["dispatch_id"]
+
+    assert client.put(f"{RESULTS_URL}/{dispatch_id}/queued").status_code == 200
+    assert client.post(RESULTS_URL, content=body).json() == {
+        "dispatch_id": dispatch_id,
+        "queued": True,
+    }
+    assert client.put(f"{RESULTS_URL}/unknown/queued").status_code == 404
+
+
+@pytest.mark.parametrize("accept_encoding", [None, "lz4"])
+def test_get_result_streams_the_file_it_opened(client, results_dir, accept_encoding):
+    """Test that a result replaced while a response is pending does not corrupt the body."""
+
+    original = frame(b"a" * 2 * 1024 * 1024)
+    dispatch_id = client.post(RESULTS_URL, content=original).json()["dispatch_id"]
+
+    resp = get_result(dispatch_id=dispatch_id, accept_encoding=accept_encoding)
+
+    replacement = results_dir / "replacement"
+    replacement.write_bytes(frame(b"b" * 3 * 1024 * 1024))
+    os.replace(replacement, result_path(dispatch_id))
+
+    async def read_body():
+        return b"".join([chunk async for chunk in resp.body_iterator])
+
+    body = asyncio.run(read_body())
+    if accept_encoding:
+        body = pytest.importorskip("lz4.frame").decompress(body)
+    else:
+        assert int(resp.headers["Content-Length"]) == len(original)
+    assert body == original
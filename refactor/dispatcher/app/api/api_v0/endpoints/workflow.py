@@ -35,6 +35,7 @@ from covalent._results_manager import Result
 
 from ....core.cancel_workflow import cancel_workflow_execution
 from ....core.dispatch_workflow import dispatch_workflow
+from ....core.serialization import fetch_result, upload_result
 from ....core.update_workflow import _update_workflow
 
 # TODO - Figure out how this BASE URI will be determined when this is deployed.
@@ -43,37 +44,6 @@ BASE_URI = os.environ.get("DATA_OS_SVC_HOST_URI")
 tasks_queue = MPQ()
 router = APIRouter()
 
-# Do we need this here?
-mock_result = {
-    "status": "COMPLETED",
-    "result": {
-        "dispatch_id": "",
-        "results_dir": "",
-        "status": "COMPLETED",
-        "graph": {
-            "links": [{"edge_name": "data", "param_type": "kwarg", "source": 0, "target": 1}],
-            "nodes": [
-                {
-                    "name": "load_data",
-                    "metadata": {"executor": "<LocalExecutor>"},
-                    "function_string": "@ct.electron\ndef load_data():\n    iris = datasets.load_iris()\n    perm = permutation(iris.target.size)\n    iris.data = iris.data[perm]\n    iris.target = iris.target[perm]\n    return iris.data, iris.target\n\n\n",
-                    "start_time": "2022-02-28T23:21:17.844268+00:00",
-                    "end_time": "2022-02-28T23:21:17.853741+00:00",
-                    "status": "COMPLETED",
-                    "output": ["[[5.  3.4 1.5 0.2]]"],
-                    "error": None,
-                    "sublattice_result": None,
-                    "stdout": "",
-                    "stderr": "",
-                    "id": 0,
-                    "doc": None,
-                    "kwargs": None,
-                }
-            ],
-        },
-    },
-}
-
 
 @router.post("/{dispatch_id}", status_code=202, response_model=DispatchWorkflowResponse)
 def submit_workflow(*, dispatch_id: str) -> Any:
@@ -81,12 +51,11 @@ def submit_workflow(*, dispatch_id: str) -> Any:
     Submit a workflow
     """
 
-    resp = requests.get(f"{BASE_URI}/api/v0/workflow/results/{dispatch_id}")
-    result_obj = resp.json()["result_obj"]
+    result_obj = fetch_result(f"{BASE_URI}/api/v0/workflow/results/{dispatch_id}")
 
     result_obj = dispatch_workflow(result_obj, tasks_queue)
 
-    requests.put(f"{BASE_URI}/api/v0/workflow/results/{dispatch_id}", data={result_obj})
+    upload_result(f"{BASE_URI}/api/v0/workflow/results/{dispatch_id}/pickle", result_obj)
 
     return {"response": f"{dispatch_id} workflow dispatched successfully"}
 
@@ -97,8 +66,7 @@ def cancel_workflow(*, dispatch_id: str) -> CancelWorkflowResponse:
     Cancel a workflow
     """
 
-    resp = requests.get(f"{BASE_URI}/api/v0/workflow/results/{dispatch_id}")
-    result_obj = resp.json()["result_obj"]
+    result_obj = fetch_result(f"{BASE_URI}/api/v0/workflow/results/{dispatch_id}")
 
     success = cancel_workflow_execution(result_obj)
 
@@ -116,12 +84,11 @@ def update_workflow(*, dispatch_id: str, task_execution_results: Node) -> Update
 
     task_id = task_execution_results["task_id"]
 
-    resp = requests.get(f"{BASE_URI}/api/v0/workflow/results/{dispatch_id}")
-    result_obj = resp.json()["result_obj"]
+    result_obj = fetch_result(f"{BASE_URI}/api/v0/workflow/results/{dispatch_id}")
 
     result_obj = _update_workflow(task_execution_results, result_obj)
 
-    requests.put(f"{BASE_URI}/api/v0/workflow/results/{dispatch_id}", data={result_obj})
+    upload_result(f"{BASE_URI}/api/v0/workflow/results/{dispatch_id}/pickle", result_obj)
 
     requests.put(f"{BASE_URI}/api/v0/ui/workflow/{dispatch_id}/task/{task_id}")
 
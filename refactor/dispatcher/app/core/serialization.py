@@ -0,0 +1,147 @@
+# Copyright 2021 Agnostiq Inc.
+#
+# This file is part of Covalent.
+#
+# Licensed under the GNU Affero General Public License 3.0 (the "License").
+# A copy of the License may be obtained with this software package or at
+#
+#      https://www.gnu.org/licenses/agpl-3.0.en.html
+#
+# Use of this file is prohibited except in compliance with the License. Any
+# modifications or derivative works of this file must retain this copyright
+# notice, and modified files must contain a notice indicating that they have
+# been altered from the originals.
+#
+# Covalent is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the License for more details.
+#
+# Relief from the License may be granted by purchasing a commercial license.
+
+"""Result object serialization for transfers to and from the Data service.
+
+Result objects travel in the framing the Data service stores them in, described in its
+`app.core.frames` module: a frame count and frame sizes, followed by the out-of-band buffers
+of a protocol 5 pickle and the pickle itself.
+"""
+
+import struct
+from typing import List
+
+import cloudpickle as pickle
+import requests
+
+from covalent._results_manager import Result
+
+try:
+    import lz4.frame
+except ModuleNotFoundError:
+    lz4 = None
+
+# Must match FRAME_COUNT and FRAME_SIZE in the Data service's app.core.frames, which defines
+# the framing; the services share no code, so the layout is repeated here
+_FRAME_COUNT = struct.Struct("<I")
+_FRAME_SIZE = struct.Struct("<Q")
+
+# Size of the chunks response bodies are read in
+_READ_CHUNK_SIZE = 64 * 1024
+
+
+def serialize_result(result_obj: Result) -> List[memoryview]:
+    """Pickle a result object with protocol 5, keeping large buffers out-of-band.
+
+    Buffers exposed through the pickle buffer protocol, e.g. contiguous NumPy arrays in node
+    outputs, are not copied into the pickle. The returned frames are the frame header followed
+    by the out-of-band buffers and the pickle itself, and can be written out one after the
+    other without joining them first.
+    """
+
+    buffers = []
+    pickled = pickle.dumps(result_obj, protocol=5, buffer_callback=buffers.append)
+
+    frames = [buffer.raw() for buffer in buffers] + [memoryview(pickled)]
+    header = _FRAME_COUNT.pack(len(frames)) + b"".join(
+        _FRAME_SIZE.pack(frame.nbytes) for frame in frames
+    )
+
+    return [memoryview(header)] + frames
+
+
+def deserialize_result(data: bytes) -> Result:
+    """Rebuild a result object from the frames written by `serialize_result`.
+
+    The out-of-band buffers are handed to the unpickler as slices of `data`, so arrays in the
+    result object share its memory instead of being copied out of it.
+    """
+
+    view = memoryview(data)
+    (num_frames,) = _FRAME_COUNT.unpack_from(view)
+    sizes = struct.unpack_from(f"<{num_frames}Q", view, _FRAME_COUNT.size)
+
+    frames = []
+    offset = _FRAME_COUNT.size + num_frames * _FRAME_SIZE.size
+    for size in sizes:
+        frames.append(view[offset : offset + size])
+        offset += size
+
+    *buffers, pickled = frames
+    return pickle.loads(pickled, buffers=buffers)
+
+
+def fetch_result(url: str) -> Result:
+    """Download and deserialize a result object from the Data service.
+
+    LZ4 compression of large results is requested when the lz4 package is installed.
+    """
+
+    headers = {"Accept-Encoding": "lz4"} if lz4 is not None else {}
+    resp = requests.get(url, headers=headers, stream=True)
+    resp.raise_for_status()
+    return deserialize_result(read_response(resp))
+
+
+def upload_result(url: str, result_obj: Result) -> None:
+    """Serialize a result object and store it in the Data service in place of the old one."""
+
+    resp = requests.put(url, data=iter(serialize_result(result_obj)))
+    resp.raise_for_status()
+
+
+def read_response(resp: requests.Response) -> bytearray:
+    """Read the body of a streamed response 64 KiB at a time.
+
+    When the server sends a Content-Length the buffer is allocated once up front and each
+    chunk is copied straight into place, instead of collecting the chunks and joining them.
+    The result is writable, so arrays rebuilt from it by `deserialize_result` are as well.
+    LZ4 compressed bodies are decompressed chunk by chunk as they arrive.
+    """
+
+    if resp.headers.get("Content-Encoding") == "lz4":
+        decompressor = lz4.frame.LZ4FrameDecompressor()
+        body = bytearray()
+        for chunk in resp.iter_content(_READ_CHUNK_SIZE):
+            body += decompressor.decompress(chunk)
+        return body
+
+    content_length = resp.headers.get("Content-Length")
+    if content_length is None:
+        body = bytearray()
+        for chunk in resp.iter_content(_READ_CHUNK_SIZE):
+            body += chunk
+        return body
+
+    body = bytearray(int(content_length))
+    view = memoryview(body)
+    offset = 0
+    for chunk in resp.iter_content(_READ_CHUNK_SIZE):
+        if offset + len(chunk) > len(body):
+            raise ValueError(
+                f"Expected {len(body)} bytes in response body but received more than {len(body)}"
+            )
+        view[offset : offset + len(chunk)] = chunk
+        offset += len(chunk)
+
+    if offset != len(body):
+        raise ValueError(f"Expected {len(body)} bytes in response body but received {offset}")
+
+    return body
@@ -0,0 +1,97 @@
+# Copyright 2021 Agnostiq Inc.
+#
+# This file is part of Covalent.
+#
+# Licensed under the GNU Affero General Public License 3.0 (the "License").
+# A copy of the License may be obtained with this software package or at
+#
+#      https://www.gnu.org/licenses/agpl-3.0.en.html
+#
+# Use of this file is prohibited except in compliance with the License. Any
+# modifications or derivative works of this file must retain this copyright
+# notice, and modified files must contain a notice indicating that they have
+# been altered from the originals.
+#
+# Covalent is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the License for more details.
+#
+# Relief from the License may be granted by purchasing a commercial license.
+
+"""Tests for the serialization of result objects sent to and from the Data service."""
+
+import pickle
+import struct
+
+import pytest
+from app.core.serialization import deserialize_result, read_response, serialize_result
+
+
+class MockResponse:
+    """Streamed response with a fixed body, split into chunks of a given size."""
+
+    def __init__(self, body: bytes, headers: dict, chunk_size: int = 3) -> None:
+        self.body = body
+        self.headers = headers
+        self.chunk_size = chunk_size
+
+    def iter_content(self, chunk_size: int):
+        for offset in range(0, len(self.body), self.chunk_size):
+            yield self.body[offset : offset + self.chunk_size]
+
+
+def test_serialize_result_round_trip():
+    """Test that out-of-band buffers survive a round trip without being copied."""
+
+    data = bytearray(b"x" * 1024)
+    result_obj = {"output": pickle.PickleBuffer(data), "status": "COMPLETED"}
+
+    frames = serialize_result(result_obj)
+    body = bytearray(b"".join(frames))
+    rebuilt = deserialize_result(body)
+
+    # Header, the out-of-band buffer and the pickle, with the buffer not copied into the pickle
+    assert len(frames) == 3
+    assert frames[1].obj is data
+    assert frames[2].nbytes < len(data)
+
+    assert rebuilt["status"] == "COMPLETED"
+    assert bytes(rebuilt["output"]) == bytes(data)
+    # The rebuilt buffer is a view of the received body rather than a copy of it
+    assert memoryview(rebuilt["output"]).obj is body
+
+
+def test_serialize_result_header():
+    """Test that the frame header describes the frames that follow it."""
+
+    frames = serialize_result({"output": pickle.PickleBuffer(bytearray(16))})
+    header = frames[0].tobytes()
+
+    (num_frames,) = struct.unpack_from("<I", header)
+    sizes = struct.unpack_from(f"<{num_frames}Q", header, 4)
+
+    assert num_frames == len(frames) - 1
+    assert list(sizes) == [frame.nbytes for frame in frames[1:]]
+    assert len(header) == 4 + 8 * num_frames
+
+
+@pytest.mark.parametrize(
+    "headers", [{"Content-Length": "10"}, {}], ids=["content-length", "no-content-length"]
+)
+def test_read_response(headers):
+    """Test that a streamed body is read in full, with or without a Content-Length."""
+
+    body = read_response(MockResponse(b"0123456789", headers))
+
+    assert isinstance(body, bytearray)
+    assert body == b"0123456789"
+
+
+@pytest.mark.parametrize("length", [9, 11], ids=["longer", "shorter"])
+def test_read_response_length_mismatch(length):
+    """Test that a body not matching its Content-Length is rejected."""
+
+    resp = MockResponse(b"0123456789", {"Content-Length": str(length)})
+
+    with pytest.raises(ValueError, match=f"Expected {length} bytes"):
+        read_response(resp)
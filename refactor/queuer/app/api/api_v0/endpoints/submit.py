@@ -18,23 +18,72 @@
 #
 # Relief from the License may be granted by purchasing a commercial license.
 
+from typing import Any
 
-from app.schemas.submit import ResultPickle, SubmitResponse
-from fastapi import APIRouter
+from app.core.data_service import RejectedResultError, data_service
+from app.core.memo import publish_once
+from app.core.publisher import dispatch_publisher
+from app.schemas.common import HTTPExceptionSchema
+from app.schemas.submit import SubmitResponse
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import JSONResponse
 
 router = APIRouter()
 
 
-@router.post("/dispatch", status_code=202, response_model=SubmitResponse)
-async def submit_workflow(*, result: ResultPickle) -> SubmitResponse:
+@router.post(
+    "/dispatch",
+    status_code=202,
+    response_model=SubmitResponse,
+    responses={
+        200: {
+            "model": SubmitResponse,
+            "description": "Return dispatch id of an identical submission already queued",
+        },
+        400: {"model": HTTPExceptionSchema, "description": "Result pickle is empty or malformed"},
+    },
+    openapi_extra={
+        "requestBody": {
+            "content": {
+                "application/octet-stream": {"schema": {"type": "string", "format": "binary"}}
+            },
+            "required": True,
+        }
+    },
+)
+async def submit_workflow(*, request: Request) -> Any:
     """
     Submit a workflow
 
     Note: The object that contains the workflow function, interface to
     update attributes in the transport graph, inputs of the workflow,
-    metadata, etc. is the result object that's why its type is ResultPickle
-    which contains the pickled result object. Its use however varies in
+    metadata, etc. is the result object that's why the request body is the
+    pickled result object. Its use however varies in
     different components. We call it the result object because it is supposed
     to be the ultimate thing the user will get and will contain everything in the workflow.
+
+    The pickle, framed the way the Data service stores result objects, is streamed to the
+    Data service as it arrives, so it is never buffered in memory as a whole, and the
+    workflow is queued only once the pickle has been stored.
+    A pickle the Data service rejects as empty or malformed is answered with a 400 status.
+
+    A result object identical to one submitted and queued earlier is not queued again; the
+    dispatch id of the earlier submission is returned with a 200 status instead. The Data
+    service records which dispatches have been queued, so this holds across restarts and
+    Queuer processes. The record is written once the dispatch has been published, so a
+    submission whose publish failed is queued by the next identical one.
     """
-    return {"dispatch_id": "48f1d3b7-27bb-4c5d-97fe-c0c61c197fd5"}
+    try:
+        dispatch_id, queued = await data_service.insert_result(request.stream())
+    except RejectedResultError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Returning responses directly skips validating our own dicts against SubmitResponse
+    if queued:
+        return JSONResponse({"dispatch_id": dispatch_id}, status_code=200)
+
+    async def publish() -> None:
+        await dispatch_publisher.publish(dispatch_id.encode())
+        await data_service.mark_queued(dispatch_id)
+
+    submitted_before = await publish_once(dispatch_id, publish)
+    return JSONResponse({"dispatch_id": dispatch_id}, status_code=200 if submitted_before else 202)
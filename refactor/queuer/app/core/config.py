@@ -26,6 +26,11 @@ from pydantic import AnyHttpUrl, BaseSettings, validator
 
 class Settings(BaseSettings):
     API_V0_STR: str = "/api/v0"
+    DATA_OS_SVC_HOST_URI: str = "http://localhost:8000"
+    NATS_URL: str = "nats://localhost:4222"
+    DISPATCH_SUBJECT: str = "dispatch"
+    PUBLISH_BATCH_SIZE: int = 40
+    PUBLISH_BATCH_WINDOW: float = 0.005
     BACKEND_CORS_ORIGINS: List[AnyHttpUrl] = []
 
     @validator("BACKEND_CORS_ORIGINS", pre=True)
@@ -0,0 +1,90 @@
+# Copyright 2021 Agnostiq Inc.
+#
+# This file is part of Covalent.
+#
+# Licensed under the GNU Affero General Public License 3.0 (the "License").
+# A copy of the License may be obtained with this software package or at
+#
+#      https://www.gnu.org/licenses/agpl-3.0.en.html
+#
+# Use of this file is prohibited except in compliance with the License. Any
+# modifications or derivative works of this file must retain this copyright
+# notice, and modified files must contain a notice indicating that they have
+# been altered from the originals.
+#
+# Covalent is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the License for more details.
+#
+# Relief from the License may be granted by purchasing a commercial license.
+
+"""Client for storing submitted result objects in the Data service."""
+
+from typing import AsyncIterator, Optional, Tuple
+
+import httpx
+
+from .config import settings
+
+
+class RejectedResultError(ValueError):
+    """Raised when the Data service refuses to store a result object."""
+
+
+class DataServiceClient:
+    """Upload result objects to the Data service over a connection pool opened by `start`."""
+
+    def __init__(self, base_uri: str) -> None:
+        self.base_uri = base_uri
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def start(self) -> None:
+        """Open the connection pool."""
+
+        # Uploads are streamed from the submitting client, so they take as long as it does
+        self._client = httpx.AsyncClient(base_url=self.base_uri, timeout=None)
+
+    async def close(self) -> None:
+        """Close the connection pool."""
+
+        if self._client is None:
+            return
+
+        await self._client.aclose()
+        self._client = None
+
+    async def insert_result(self, chunks: AsyncIterator[bytes]) -> Tuple[str, bool]:
+        """Stream a pickled result object to the Data service.
+
+        Returns the dispatch id of the result and whether it has been marked as queued with
+        `mark_queued`. The Data service addresses uploads by their contents, so an identical
+        pickle always gets the same dispatch id, and the marker is shared by every Queuer
+        process and kept across restarts. Raises ``RejectedResultError`` if the pickle is
+        empty or not framed the way the Data service expects.
+        """
+
+        resp = await self._started().post(
+            "/api/v0/workflow/results",
+            content=chunks,
+            headers={"Content-Type": "application/octet-stream"},
+        )
+        if resp.status_code == 400:
+            raise RejectedResultError(resp.json()["detail"])
+        resp.raise_for_status()
+
+        body = resp.json()
+        return body["dispatch_id"], body["queued"]
+
+    async def mark_queued(self, dispatch_id: str) -> None:
+        """Record in the Data service that a dispatch has been queued."""
+
+        resp = await self._started().put(f"/api/v0/workflow/results/{dispatch_id}/queued")
+        resp.raise_for_status()
+
+    def _started(self) -> httpx.AsyncClient:
+        if self._client is None:
+            raise RuntimeError("Data service client has not been started")
+        return self._client
+
+
+data_service = DataServiceClient(settings.DATA_OS_SVC_HOST_URI)
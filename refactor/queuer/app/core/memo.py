@@ -0,0 +1,58 @@
+# Copyright 2021 Agnostiq Inc.
+#
+# This file is part of Covalent.
+#
+# Licensed under the GNU Affero General Public License 3.0 (the "License").
+# A copy of the License may be obtained with this software package or at
+#
+#      https://www.gnu.org/licenses/agpl-3.0.en.html
+#
+# Use of this file is prohibited except in compliance with the License. Any
+# modifications or derivative works of this file must retain this copyright
+# notice, and modified files must contain a notice indicating that they have
+# been altered from the originals.
+#
+# Covalent is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the License for more details.
+#
+# Relief from the License may be granted by purchasing a commercial license.
+
+"""Memoization of workflow submissions in progress."""
+
+import asyncio
+from typing import Awaitable, Callable, Dict
+
+# Dispatch id -> future resolved with whether the publish in progress in this process succeeded
+_publishing: Dict[str, asyncio.Future] = {}
+
+
+async def publish_once(dispatch_id: str, publish: Callable[[], Awaitable[None]]) -> bool:
+    """Publish a dispatch unless an identical submission in this process does so meanwhile.
+
+    Returns whether the dispatch was published by another submission. Identical submissions
+    handled concurrently by this process wait for the first one's publish instead of
+    publishing the dispatch again, and publish it themselves if that failed. Submissions
+    that arrive after a dispatch was queued, or in other processes, are recognized by the
+    Data service's record of queued dispatches instead.
+    """
+
+    while True:
+        pending = _publishing.get(dispatch_id)
+        if pending is None:
+            break
+        # Shielded, so a waiter being cancelled does not cancel the future for the others
+        if await asyncio.shield(pending):
+            return True
+
+    future = asyncio.get_running_loop().create_future()
+    _publishing[dispatch_id] = future
+    published = False
+    try:
+        await publish()
+        published = True
+    finally:
+        del _publishing[dispatch_id]
+        future.set_result(published)
+
+    return False
@@ -0,0 +1,143 @@
+# Copyright 2021 Agnostiq Inc.
+#
+# This file is part of Covalent.
+#
+# Licensed under the GNU Affero General Public License 3.0 (the "License").
+# A copy of the License may be obtained with this software package or at
+#
+#      https://www.gnu.org/licenses/agpl-3.0.en.html
+#
+# Use of this file is prohibited except in compliance with the License. Any
+# modifications or derivative works of this file must retain this copyright
+# notice, and modified files must contain a notice indicating that they have
+# been altered from the originals.
+#
+# Covalent is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the License for more details.
+#
+# Relief from the License may be granted by purchasing a commercial license.
+
+"""Batched publishing of dispatch messages to NATS."""
+
+import asyncio
+from typing import List, Optional, Set, Tuple
+
+import nats
+from nats.aio.client import Client
+
+from .config import settings
+
+
+class BatchPublisher:
+    """Publish messages to a NATS subject in batches.
+
+    Messages published within `window` seconds of the first one in a batch, up to `max_batch`
+    of them, are written to the connection together and confirmed with a single flush, so
+    concurrent submissions share one round trip to the server instead of paying for one each.
+
+    A single connection is opened by `start` and shared by every request until `close`. If
+    publishing stops for any reason, messages that have not been flushed fail instead of
+    leaving their publishers waiting.
+    """
+
+    def __init__(self, subject: str, max_batch: int, window: float) -> None:
+        self.subject = subject
+        self.max_batch = max_batch
+        self.window = window
+        self._nc: Optional[Client] = None
+        self._pending: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._futures: Set[asyncio.Future] = set()
+        self._closed = True
+
+    async def start(self) -> None:
+        """Connect to NATS and start publishing."""
+
+        self._nc = await nats.connect(settings.NATS_URL)
+        self._pending = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+        self._task.add_done_callback(self._fail_pending)
+        self._closed = False
+
+    async def close(self) -> None:
+        """Publish the messages still pending, then close the connection."""
+
+        if self._task is None:
+            return
+
+        self._closed = True
+        if not self._task.done():
+            await self._pending.put(None)
+        try:
+            await self._task
+        finally:
+            await self._nc.drain()
+            self._task = None
+
+    async def publish(self, payload: bytes) -> None:
+        """Publish a message, returning once the batch it was sent in has been flushed."""
+
+        if self._closed:
+            raise RuntimeError("Publisher is not running")
+
+        future = asyncio.get_running_loop().create_future()
+        self._futures.add(future)
+        future.add_done_callback(self._futures.discard)
+        await self._pending.put((payload, future))
+        await future
+
+    def _fail_pending(self, task: asyncio.Task) -> None:
+        # `_run` has stopped, so nothing will resolve the futures of messages still waiting
+        self._closed = True
+        for future in list(self._futures):
+            if not future.done():
+                future.set_exception(RuntimeError("Publisher stopped before sending message"))
+
+    async def _next_batch(self) -> List[Tuple[bytes, asyncio.Future]]:
+        loop = asyncio.get_running_loop()
+        batch = [await self._pending.get()]
+        deadline = loop.time() + self.window
+
+        while len(batch) < self.max_batch:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._pending.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _send(self, batch: List[Tuple[bytes, asyncio.Future]]) -> None:
+        try:
+            for payload, _ in batch:
+                await self._nc.publish(self.subject, payload)
+            await self._nc.flush()
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for _, future in batch:
+                if not future.done():
+                    future.set_result(None)
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+
+            # `close` enqueues None to stop once everything before it has been sent
+            closing = None in batch
+            batch = [item for item in batch if item is not None]
+
+            if batch:
+                await self._send(batch)
+            if closing:
+                return
+
+
+dispatch_publisher = BatchPublisher(
+    settings.DISPATCH_SUBJECT, settings.PUBLISH_BATCH_SIZE, settings.PUBLISH_BATCH_WINDOW
+)
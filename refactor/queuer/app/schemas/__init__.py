@@ -19,4 +19,4 @@
 # Relief from the License may be granted by purchasing a commercial license.
 
 
-from .submit import ResultPickle, SubmitResponse
+from .submit import SubmitResponse
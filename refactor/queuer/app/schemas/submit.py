@@ -22,9 +22,5 @@
 from pydantic import BaseModel
 
 
-class ResultPickle(BaseModel):
-    result_object: bytes
-
-
 class SubmitResponse(BaseModel):
     dispatch_id: str
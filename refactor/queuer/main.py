@@ -22,6 +22,8 @@ from pathlib import Path
 
 from app.api.api_v0.api import api_router
 from app.core.config import settings
+from app.core.data_service import data_service
+from app.core.publisher import dispatch_publisher
 from fastapi import FastAPI
 
 BASE_PATH = Path(__file__).resolve().parent
@@ -29,6 +31,18 @@ BASE_PATH = Path(__file__).resolve().parent
 app = FastAPI(title="Covalent Queuer Service API")
 
 
+@app.on_event("startup")
+async def start_clients() -> None:
+    await data_service.start()
+    await dispatch_publisher.start()
+
+
+@app.on_event("shutdown")
+async def close_clients() -> None:
+    await dispatch_publisher.close()
+    await data_service.close()
+
+
 app.include_router(api_router, prefix=settings.API_V0_STR)
 
 
@@ -22,6 +22,7 @@
 from multiprocessing import Queue as MPQ
 
 from app.core.execution import get_task_status, run_available_tasks
+from app.core.routing import JSONRoute
 from app.schemas.task import CancelResponse, RunTaskResponse, TaskPickleList, TaskStatus
 from fastapi import APIRouter
 
@@ -33,7 +34,8 @@ track_status_queue = MPQ()
 AVAILABLE_RESOURCES = 4
 
 
-router = APIRouter()
+# Task lists arrive as large JSON bodies of pickled tasks
+router = APIRouter(route_class=JSONRoute)
 
 
 @router.post("/{dispatch_id}/tasks", status_code=202, response_model=RunTaskResponse)
@@ -0,0 +1,72 @@
+# Copyright 2021 Agnostiq Inc.
+#
+# This file is part of Covalent.
+#
+# Licensed under the GNU Affero General Public License 3.0 (the "License").
+# A copy of the License may be obtained with this software package or at
+#
+#      https://www.gnu.org/licenses/agpl-3.0.en.html
+#
+# Use of this file is prohibited except in compliance with the License. Any
+# modifications or derivative works of this file must retain this copyright
+# notice, and modified files must contain a notice indicating that they have
+# been altered from the originals.
+#
+# Covalent is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the License for more details.
+#
+# Relief from the License may be granted by purchasing a commercial license.
+
+"""Request body parsing for endpoints that receive large JSON bodies."""
+
+import json
+from typing import Any, Callable
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from starlette.concurrency import run_in_threadpool
+
+try:
+    import simdjson
+except ModuleNotFoundError:
+    simdjson = None
+
+# Bodies at least this large are parsed in the threadpool instead of on the event loop
+_THREADPOOL_PARSE_SIZE = 1024 * 1024
+
+
+def _loads(body: bytes) -> Any:
+    if simdjson is None:
+        return json.loads(body)
+
+    try:
+        return simdjson.loads(body)
+    except ValueError:
+        # Let the standard parser raise the JSONDecodeError FastAPI turns into a 422
+        return json.loads(body)
+
+
+class JSONRequest(Request):
+    """Request that parses its JSON body with simdjson when it is installed."""
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            body = await self.body()
+            if len(body) >= _THREADPOOL_PARSE_SIZE:
+                self._json = await run_in_threadpool(_loads, body)
+            else:
+                self._json = _loads(body)
+        return self._json
+
+
+class JSONRoute(APIRoute):
+    """Route that hands its endpoint a `JSONRequest`."""
+
+    def get_route_handler(self) -> Callable:
+        route_handler = super().get_route_handler()
+
+        async def json_route_handler(request: Request) -> Response:
+            return await route_handler(JSONRequest(request.scope, request.receive))
+
+        return json_route_handler
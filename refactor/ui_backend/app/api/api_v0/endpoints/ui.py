@@ -18,17 +18,21 @@
 #
 # Relief from the License may be granted by purchasing a commercial license.
 
+import json
+from typing import Any
 
 from app.schemas.ui import UpdateUIResponse
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
 
 router = APIRouter()
 
+_UI_UPDATED_JSON = json.dumps({"response": "UI Updated"}, separators=(",", ":")).encode()
+
 
 @router.put("/workflow/{dispatch_id}/task/{task_id}", status_code=200, response_model=UpdateUIResponse)
-def update_ui(*, dispatch_id: str, task_id: int) -> UpdateUIResponse:
+async def update_ui(*, dispatch_id: str, task_id: int) -> Any:
     """
     API Endpoint (/api/workflow/task) to update ui frontend
     """
 
-    return {"response": "UI Updated"}
+    return Response(content=_UI_UPDATED_JSON, media_type="application/json")